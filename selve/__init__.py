@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import inspect
+import logging
 import queue
 import threading
 import time
+import weakref
 from itertools import chain
 from typing import Callable
 
@@ -37,13 +40,121 @@ from selve.util.errors import *
 from selve.util.protocol import ParameterType
 
 
+# Seconds to wait after every write, so the gateway can process the command
+WRITE_DELAY = 0.5
+
+# Response class for every known methodName of the gateway
+RESPONSE_TYPES = {
+    ##Service
+    "selve.GW." + CommeoServiceCommand.PING.value: ServicePingResponse,
+    "selve.GW." + CommeoServiceCommand.GETSTATE.value: ServiceGetStateResponse,
+    "selve.GW." + CommeoServiceCommand.GETVERSION.value: ServiceGetVersionResponse,
+    "selve.GW." + CommeoServiceCommand.RESET.value: ServiceResetResponse,
+    "selve.GW." + CommeoServiceCommand.FACTORYRESET.value: ServiceFactoryResetResponse,
+    "selve.GW." + CommeoServiceCommand.SETLED.value: ServiceSetLedResponse,
+    "selve.GW." + CommeoServiceCommand.GETLED.value: ServiceGetLedResponse,
+
+    ##Param
+    "selve.GW." + CommeoParamCommand.SETFORWARD.value: ParamSetForwardResponse,
+    "selve.GW." + CommeoParamCommand.GETFORWARD.value: ParamGetForwardResponse,
+    "selve.GW." + CommeoParamCommand.SETEVENT.value: ParamSetEventResponse,
+    "selve.GW." + CommeoParamCommand.GETEVENT.value: ParamGetEventResponse,
+    "selve.GW." + CommeoParamCommand.GETDUTY.value: ParamGetDutyResponse,
+    "selve.GW." + CommeoParamCommand.GETRF.value: ParamGetRfResponse,
+
+    ##Device
+    "selve.GW." + CommeoDeviceCommand.SCANSTART.value: DeviceScanStartResponse,
+    "selve.GW." + CommeoDeviceCommand.SCANSTOP.value: DeviceScanStopResponse,
+    "selve.GW." + CommeoDeviceCommand.SCANRESULT.value: DeviceScanResultResponse,
+    "selve.GW." + CommeoDeviceCommand.SAVE.value: DeviceSaveResponse,
+    "selve.GW." + CommeoDeviceCommand.GETIDS.value: DeviceGetIdsResponse,
+    "selve.GW." + CommeoDeviceCommand.GETINFO.value: DeviceGetInfoResponse,
+    "selve.GW." + CommeoDeviceCommand.GETVALUES.value: DeviceGetValuesResponse,
+    "selve.GW." + CommeoDeviceCommand.SETFUNCTION.value: DeviceSetFunctionResponse,
+    "selve.GW." + CommeoDeviceCommand.SETLABEL.value: DeviceSetLabelResponse,
+    "selve.GW." + CommeoDeviceCommand.SETTYPE.value: DeviceSetTypeResponse,
+    "selve.GW." + CommeoDeviceCommand.DELETE.value: DeviceDeleteResponse,
+    "selve.GW." + CommeoDeviceCommand.WRITEMANUAL.value: DeviceWriteManualResponse,
+
+    ##Sensor
+    "selve.GW." + CommeoSensorCommand.TEACHSTART.value: SensorTeachStartResponse,
+    "selve.GW." + CommeoSensorCommand.TEACHSTOP.value: SensorTeachStopResponse,
+    "selve.GW." + CommeoSensorCommand.TEACHRESULT.value: SensorTeachResultResponse,
+    "selve.GW." + CommeoSensorCommand.GETIDS.value: SensorGetIdsResponse,
+    "selve.GW." + CommeoSensorCommand.GETINFO.value: SensorGetInfoResponse,
+    "selve.GW." + CommeoSensorCommand.GETVALUES.value: SensorGetValuesResponse,
+    "selve.GW." + CommeoSensorCommand.SETLABEL.value: SensorSetLabelResponse,
+    "selve.GW." + CommeoSensorCommand.DELETE.value: SensorDeleteResponse,
+    "selve.GW." + CommeoSensorCommand.WRITEMANUAL.value: SensorWriteManualResponse,
+
+    ##SenSim
+    "selve.GW." + CommeoSenSimCommand.STORE.value: SenSimStoreResponse,
+    "selve.GW." + CommeoSenSimCommand.DELETE.value: SenSimDeleteResponse,
+    "selve.GW." + CommeoSenSimCommand.GETCONFIG.value: SenSimGetConfigResponse,
+    "selve.GW." + CommeoSenSimCommand.SETCONFIG.value: SenSimSetConfigResponse,
+    "selve.GW." + CommeoSenSimCommand.SETLABEL.value: SenSimSetLabelResponse,
+    "selve.GW." + CommeoSenSimCommand.SETVALUES.value: SenSimSetValuesResponse,
+    "selve.GW." + CommeoSenSimCommand.GETVALUES.value: SenSimGetValuesResponse,
+    "selve.GW." + CommeoSenSimCommand.GETIDS.value: SenSimGetIdsResponse,
+    "selve.GW." + CommeoSenSimCommand.FACTORY.value: SenSimFactoryResponse,
+    "selve.GW." + CommeoSenSimCommand.DRIVE.value: SenSimDriveResponse,
+    "selve.GW." + CommeoSenSimCommand.SETTEST.value: SenSimSetTestResponse,
+    "selve.GW." + CommeoSenSimCommand.GETTEST.value: SenSimGetTestResponse,
+
+    ##Sender
+    "selve.GW." + CommeoSenderCommand.TEACHSTART.value: SenderTeachStartResponse,
+    "selve.GW." + CommeoSenderCommand.TEACHSTOP.value: SenderTeachStopResponse,
+    "selve.GW." + CommeoSenderCommand.TEACHRESULT.value: SenderTeachResultResponse,
+    "selve.GW." + CommeoSenderCommand.GETIDS.value: SenderGetIdsResponse,
+    "selve.GW." + CommeoSenderCommand.GETINFO.value: SenderGetInfoResponse,
+    "selve.GW." + CommeoSenderCommand.GETVALUES.value: SenderGetValuesResponse,
+    "selve.GW." + CommeoSenderCommand.SETLABEL.value: SenderSetLabelResponse,
+    "selve.GW." + CommeoSenderCommand.DELETE.value: SenderDeleteResponse,
+    "selve.GW." + CommeoSenderCommand.WRITEMANUAL.value: SenderWriteManualResponse,
+
+    ##Group
+    "selve.GW." + CommeoGroupCommand.READ.value: GroupReadResponse,
+    "selve.GW." + CommeoGroupCommand.WRITE.value: GroupWriteResponse,
+    "selve.GW." + CommeoGroupCommand.GETIDS.value: GroupGetIdsResponse,
+    "selve.GW." + CommeoGroupCommand.DELETE.value: GroupDeleteResponse,
+
+    ##Command
+    "selve.GW." + CommeoCommandCommand.DEVICE.value: CommandDeviceResponse,
+    "selve.GW." + CommeoCommandCommand.GROUP.value: CommandGroupResponse,
+    "selve.GW." + CommeoCommandCommand.GROUPMAN.value: CommandGroupManResponse,
+    "selve.GW." + CommeoCommandCommand.RESULT.value: CommandResultResponse,
+
+    ##Iveo
+    "selve.GW." + IveoCommand.FACTORY.value: IveoFactoryResponse,
+    "selve.GW." + IveoCommand.SETCONFIG.value: IveoSetConfigResponse,
+    "selve.GW." + IveoCommand.GETCONFIG.value: IveoGetConfigResponse,
+    "selve.GW." + IveoCommand.GETIDS.value: IveoGetIdsResponse,
+    "selve.GW." + IveoCommand.SETREPEATER.value: IveoSetRepeaterResponse,
+    "selve.GW." + IveoCommand.GETREPEATER.value: IveoGetRepeaterResponse,
+    "selve.GW." + IveoCommand.SETLABEL.value: IveoSetLabelResponse,
+    "selve.GW." + IveoCommand.TEACH.value: IveoTeachResponse,
+    "selve.GW." + IveoCommand.LEARN.value: IveoLearnResponse,
+    "selve.GW." + IveoCommand.MANUAL.value: IveoManualResponse,
+    "selve.GW." + IveoCommand.AUTOMATIC.value: IveoAutomaticResponse,
+    "selve.GW." + IveoCommand.RESULT.value: IveoResultResponse,
+
+    ##Events
+    "selve.GW." + CommeoEventCommand.DEVICE.value: CommeoDeviceEventResponse,
+    "selve.GW." + CommeoEventCommand.SENSOR.value: SensorEventResponse,
+    "selve.GW." + CommeoEventCommand.SENDER.value: SenderEventResponse,
+    "selve.GW." + CommeoEventCommand.LOG.value: LogEventResponse,
+    "selve.GW." + CommeoEventCommand.DUTYCYCLE.value: DutyCycleResponse,
+}
+
+
 class Selve:
     """Implementation of the serial communication to the Selve Gateway"""
 
     def __init__(self, port=None, discover=True, develop=False, logger=None, loop=None):
         # Gateway state
-        self._callbacks = set()
-        self._eventCallbacks = set()
+        # Registered callbacks, keyed by _callbackKey()
+        self._callbacks = {}
+        self._eventCallbacks = {}
         self.lastLogEvent = None
         self.state = None
         self.loop = loop
@@ -77,6 +188,10 @@ class Selve:
         self._writeLock = asyncio.Lock()
         self._readLock = asyncio.Lock()
 
+        # Only one setup may run at a time, later calls reuse the open connection
+        self._setupLock = asyncio.Lock()
+        self._isSetup = False
+
         # Trasmit and Recieve Queue init
         self.txQ = None
         self.rxQ = None
@@ -142,6 +257,21 @@ class Selve:
 
 
     async def setup(self, discover=False, fromConfigFlow=False):
+        async with self._setupLock:
+            if not fromConfigFlow and self._isConnected():
+                # already connected, only bring back a stopped worker
+                if discover:
+                    await self.discover()
+                await self.startWorker()
+                return
+            await self._setup(discover, fromConfigFlow)
+            if not fromConfigFlow:
+                self._isSetup = True
+
+    def _isConnected(self):
+        return self._isSetup and self._serial is not None and self._serial.is_open
+
+    async def _setup(self, discover=False, fromConfigFlow=False):
         self._LOGGER.info("Setup")
 
         self.rxQ = asyncio.Queue()
@@ -312,33 +442,68 @@ class Selve:
         self.workerTask = None
 
 
+    async def resetWorkerState(self):
+        """Stops the worker and drops all queued commands, call startWorker() afterwards to run it again"""
+        await self.stopWorker()
+        if self.txQ is None:
+            return
+        while not self.txQ.empty():
+            self.txQ.get_nowait()
+            self.txQ.task_done()
+
+
     async def stopGateway(self):
         # wait for the rx/tx thread to end, these need to be gathered to
         # collect all the exceptions
         self._LOGGER.debug("Preparing for termination")
         await self.stopWorker()
         # close the serial port, do the cleanup
-        if self._serial.is_open:
+        if self._serial is not None and self._serial.is_open:
             self._serial.close()
         self._serial = None
+        self._isSetup = False
         return True
 
 
     def register_callback(self, callback: Callable[[], None]) -> None:
         """Register callback, called when Roller changes state."""
-        self._callbacks.add(callback)
+        self._addCallback(self._callbacks, callback)
 
     def remove_callback(self, callback: Callable[[], None]) -> None:
         """Remove previously registered callback."""
-        self._callbacks.discard(callback)
+        self._callbacks.pop(self._callbackKey(callback), None)
 
     def register_event_callback(self, callback: Callable[[], None]) -> None:
         """Register callback, called when other events take place."""
-        self._eventCallbacks.add(callback)
+        self._addCallback(self._eventCallbacks, callback)
 
     def remove_event_callback(self, callback: Callable[[], None]) -> None:
         """Remove previously registered callback."""
-        self._eventCallbacks.discard(callback)
+        self._eventCallbacks.pop(self._callbackKey(callback), None)
+
+    def _callbackKey(self, callback):
+        """Bound methods are keyed by the identity of their owner, so unhashable or equal owners stay separate."""
+        if inspect.ismethod(callback):
+            return (id(callback.__self__), callback.__func__)
+        return callback
+
+    def _addCallback(self, registry, callback):
+        """Bound methods are only referenced weakly, so they are dropped from the registry together with their owner."""
+        key = self._callbackKey(callback)
+        if inspect.ismethod(callback):
+            def drop(ref):
+                if registry.get(key) is ref:
+                    del registry[key]
+            callback = weakref.WeakMethod(callback, drop)
+        registry[key] = callback
+
+    def _iterCallbacks(self, registry):
+        for callback in list(registry.values()):
+            if isinstance(callback, weakref.WeakMethod):
+                callback = callback()
+                if callback is None:
+                    continue
+            yield callback
 
 
     def updateOptions(self, reversedStopPosition = 0):
@@ -354,7 +519,7 @@ class Selve:
             self._serial.write(commandstr)
             self._serial.flush()
             #always sleep after writing
-            await asyncio.sleep(0.5)
+            await asyncio.sleep(WRITE_DELAY)
 
         except (serial.SerialException, IOError) as se:
             self._LOGGER.info('Serial error, trying to reconnect once... ' + str(se))
@@ -367,7 +532,7 @@ class Selve:
                 self._serial.write(commandstr)
                 self._serial.flush()
                 #always sleep after writing
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(WRITE_DELAY)
             
             except Exception as e:
                 self._LOGGER.error("error communicating: " + str(e) + " ; Please restart the integration!")
@@ -424,7 +589,7 @@ class Selve:
                 self.processTeachResponse(response)
                 return True
 
-            for callback in self._callbacks:
+            for callback in self._iterCallbacks(self._callbacks):
                 callback()
             return response
 
@@ -449,7 +614,7 @@ class Selve:
     def create_response_call(self, obj):
         if hasattr(obj, "methodCall"):
             array = obj.methodCall.array
-            return self._create_response(array, obj.methodCall.methodName)
+            return self._create_response(array, obj.methodCall.methodName.cdata)
         else:
             raise CommunicationError()
 
@@ -471,185 +636,9 @@ class Selve:
         paramslist = [str_params, int_params, b64_params]
         flat_params_list = list(chain.from_iterable(paramslist))
 
-        ##Service
-        if methodName == "selve.GW." + str(CommeoServiceCommand.PING.value):
-            return ServicePingResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoServiceCommand.GETSTATE.value):
-            return ServiceGetStateResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoServiceCommand.GETVERSION.value):
-            return ServiceGetVersionResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoServiceCommand.RESET.value):
-            return ServiceResetResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoServiceCommand.FACTORYRESET.value):
-            return ServiceFactoryResetResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoServiceCommand.SETLED.value):
-            return ServiceSetLedResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoServiceCommand.GETLED.value):
-            return ServiceGetLedResponse(methodName, flat_params_list)
-
-        ##Param
-        if methodName == "selve.GW." + str(CommeoParamCommand.SETFORWARD.value):
-            return ParamSetForwardResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoParamCommand.GETFORWARD.value):
-            return ParamGetForwardResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoParamCommand.SETEVENT.value):
-            return ParamSetEventResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoParamCommand.GETEVENT.value):
-            return ParamGetEventResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoParamCommand.GETDUTY.value):
-            return ParamGetDutyResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoParamCommand.GETRF.value):
-            return ParamGetRfResponse(methodName, flat_params_list)
-
-        ##Device
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.SCANSTART.value):
-            return DeviceScanStartResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.SCANSTOP.value):
-            return DeviceScanStopResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.SCANRESULT.value):
-            return DeviceScanResultResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.SAVE.value):
-            return DeviceSaveResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.GETIDS.value):
-            return DeviceGetIdsResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.GETINFO.value):
-            return DeviceGetInfoResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.GETVALUES.value):
-            return DeviceGetValuesResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.SETFUNCTION.value):
-            return DeviceSetFunctionResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.SETLABEL.value):
-            return DeviceSetLabelResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.SETTYPE.value):
-            return DeviceSetTypeResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.DELETE.value):
-            return DeviceDeleteResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoDeviceCommand.WRITEMANUAL.value):
-            return DeviceWriteManualResponse(methodName, flat_params_list)
-
-        ##Sensor
-        if methodName == "selve.GW." + str(CommeoSensorCommand.TEACHSTART.value):
-            return SensorTeachStartResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSensorCommand.TEACHSTOP.value):
-            return SensorTeachStopResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSensorCommand.TEACHRESULT.value):
-            return SensorTeachResultResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSensorCommand.GETIDS.value):
-            return SensorGetIdsResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSensorCommand.GETINFO.value):
-            return SensorGetInfoResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSensorCommand.GETVALUES.value):
-            return SensorGetValuesResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSensorCommand.SETLABEL.value):
-            return SensorSetLabelResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSensorCommand.DELETE.value):
-            return SensorDeleteResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSensorCommand.WRITEMANUAL.value):
-            return SensorWriteManualResponse(methodName, flat_params_list)
-
-        ##SenSim
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.STORE.value):
-            return SenSimStoreResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.DELETE.value):
-            return SenSimDeleteResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.GETCONFIG.value):
-            return SenSimGetConfigResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.SETCONFIG.value):
-            return SenSimSetConfigResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.SETLABEL.value):
-            return SenSimSetLabelResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.SETVALUES.value):
-            return SenSimSetValuesResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.GETVALUES.value):
-            return SenSimGetValuesResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.GETIDS.value):
-            return SenSimGetIdsResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.FACTORY.value):
-            return SenSimFactoryResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.DRIVE.value):
-            return SenSimDriveResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.SETTEST.value):
-            return SenSimSetTestResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenSimCommand.GETTEST.value):
-            return SenSimGetTestResponse(methodName, flat_params_list)
-
-        ##Sender
-        if methodName == "selve.GW." + str(CommeoSenderCommand.TEACHSTART.value):
-            return SenderTeachStartResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenderCommand.TEACHSTOP.value):
-            return SenderTeachStopResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenderCommand.TEACHRESULT.value):
-            return SenderTeachResultResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenderCommand.GETIDS.value):
-            return SenderGetIdsResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenderCommand.GETINFO.value):
-            return SenderGetInfoResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenderCommand.GETVALUES.value):
-            return SenderGetValuesResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenderCommand.SETLABEL.value):
-            return SenderSetLabelResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenderCommand.DELETE.value):
-            return SenderDeleteResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoSenderCommand.WRITEMANUAL.value):
-            return SenderWriteManualResponse(methodName, flat_params_list)
-
-        ##Group
-        if methodName == "selve.GW." + str(CommeoGroupCommand.READ.value):
-            return GroupReadResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoGroupCommand.WRITE.value):
-            return GroupWriteResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoGroupCommand.GETIDS.value):
-            return GroupGetIdsResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoGroupCommand.DELETE.value):
-            return GroupDeleteResponse(methodName, flat_params_list)
-
-        ##Command
-        if methodName == "selve.GW." + str(CommeoCommandCommand.DEVICE.value):
-            return CommandDeviceResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoCommandCommand.GROUP.value):
-            return CommandGroupResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoCommandCommand.GROUPMAN.value):
-            return CommandGroupManResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoCommandCommand.RESULT.value):
-            return CommandResultResponse(methodName, flat_params_list)
-
-        ##Iveo
-        if methodName == "selve.GW." + str(IveoCommand.FACTORY.value):
-            return IveoFactoryResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.SETCONFIG.value):
-            return IveoSetConfigResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.GETCONFIG.value):
-            return IveoGetConfigResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.GETIDS.value):
-            return IveoGetIdsResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.SETREPEATER.value):
-            return IveoSetRepeaterResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.GETREPEATER.value):
-            return IveoGetRepeaterResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.SETLABEL.value):
-            return IveoSetLabelResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.TEACH.value):
-            return IveoTeachResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.LEARN.value):
-            return IveoLearnResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.MANUAL.value):
-            return IveoManualResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.AUTOMATIC.value):
-            return IveoAutomaticResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(IveoCommand.RESULT.value):
-            return IveoResultResponse(methodName, flat_params_list)
-
-        ##Events
-        if methodName == "selve.GW." + str(CommeoEventCommand.DEVICE.value):
-            return CommeoDeviceEventResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoEventCommand.SENSOR.value):
-            return SensorEventResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoEventCommand.SENDER.value):
-            return SenderEventResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoEventCommand.LOG.value):
-            return LogEventResponse(methodName, flat_params_list)
-        if methodName == "selve.GW." + str(CommeoEventCommand.DUTYCYCLE.value):
-            return DutyCycleResponse(methodName, flat_params_list)
+        responseType = RESPONSE_TYPES.get(methodName)
+        if responseType is not None:
+            return responseType(methodName, flat_params_list)
 
         # Any other response (unknown)
         return MethodResponse(methodName, flat_params_list)
@@ -684,7 +673,7 @@ class Selve:
                 if not self._serial.is_open:
                     self._serial.open()
                 await self._sendCommandToGateway(command)
-                start_time = time.time()
+                start_time = time.monotonic()
                 while True:
                     if self._serial.in_waiting > 0:
                         msg = ""
@@ -707,8 +696,10 @@ class Selve:
 
                         return resp
                     # When no data is waiting in the input buffer after 10s we can assume, the message was not correctly sent or no input is necessary
-                    if time.time() - start_time > 10:
+                    if time.monotonic() - start_time > 10:
                         return False
+                    # yield to the event loop while waiting for the answer
+                    await asyncio.sleep(0.01)
 
 
 
@@ -832,14 +823,17 @@ class Selve:
 
 
     async def updateAllDevices(self):
-        for device in self.devices[SelveTypes.DEVICE.value]:
-            await self.updateCommeoDeviceValues(device.id)
-        for sensor in self.devices[SelveTypes.SENSOR.value]:
-            await self.updateSensorValuesAsync(sensor.id)
-        for senSim in self.devices[SelveTypes.SENSIM.value]:
-            await self.updateSenSimValuesAsync(senSim.id)
-        for sender in self.devices[SelveTypes.SENDER.value]:
-            await self.updateSenderValuesAsync(sender.id)
+        # sequentially, every synchronous update stops and restarts the worker
+        updates = [(self.updateCommeoDeviceValues, SelveTypes.DEVICE),
+                   (self.updateSensorValuesAsync, SelveTypes.SENSOR),
+                   (self.updateSenSimValuesAsync, SelveTypes.SENSIM),
+                   (self.updateSenderValuesAsync, SelveTypes.SENDER)]
+        for update, type in updates:
+            for device in list(self.devices[type.value].values()):
+                try:
+                    await update(device.id)
+                except Exception as e:
+                    self._LOGGER.error("Error updating " + type.name + " " + str(device.id) + ": " + str(e))
 
 
 
@@ -848,7 +842,7 @@ class Selve:
         # add in gateway
 
         # if there is a callback for updates, call it
-        for callback in self._callbacks:
+        for callback in self._iterCallbacks(self._callbacks):
             callback()
 
     def getDevice(self, id: int, type: SelveTypes) -> SelveDevice | SelveSensor | SelveSender | SelveGroup | SelveSenSim | None:
@@ -911,7 +905,7 @@ class Selve:
             self._LOGGER.debug("Current teaching state: " + str(response.scanState.name))
 
 
-        for callback in self._eventCallbacks:
+        for callback in self._iterCallbacks(self._eventCallbacks):
             callback(response)
 
 
@@ -983,7 +977,7 @@ class Selve:
 
             sender.lastEvent = response.event
             sender.name = response.senderName
-            self.addOrUpdateDevice(sender, SelveTypes.SENSOR)
+            self.addOrUpdateDevice(sender, SelveTypes.SENDER)
 
         if isinstance(response, LogEventResponse):
             self.lastLogEvent = response
@@ -1002,7 +996,7 @@ class Selve:
             self.utilization = response.traffic
             
 
-        for callback in self._eventCallbacks:
+        for callback in self._iterCallbacks(self._eventCallbacks):
             callback(response)
 
 
@@ -1021,7 +1015,7 @@ class Selve:
 
         #         self.addOrUpdateDevice(dev, SelveTypes.IVEO)
 
-        for callback in self._callbacks:
+        for callback in self._iterCallbacks(self._callbacks):
             callback()
 
 
@@ -1105,6 +1099,8 @@ class Selve:
         """[summary]
         Log the list of registered devices
         """
+        if not self._LOGGER.isEnabledFor(logging.INFO):
+            return
         for id, val in self.devices.items():
             for ida, device in val.items():
                 self._LOGGER.info(str(device))
@@ -1117,9 +1113,9 @@ class Selve:
 
         # time.sleep(2)
 
-        start_time = time.time()
+        start_time = time.monotonic()
         while await self.gatewayState() != ServiceState.READY:
-            if time.time() - start_time >= 30:
+            if time.monotonic() - start_time >= 30:
                 self._LOGGER.info("Error: Gateway could not be reset or loads too long")
             pass
         self._LOGGER.info("Gateway reset")
@@ -1130,9 +1126,9 @@ class Selve:
         if response.executed is not True:
             self._LOGGER.info("Error: Gateway could not be reset or loads too long")
 
-        start_time = time.time()
+        start_time = time.monotonic()
         while await self.gatewayState() != ServiceState.READY:
-            if time.time() - start_time >= 60:
+            if time.monotonic() - start_time >= 60:
                 self._LOGGER.info("Error: Gateway could not be reset or loads too long")
             pass
         self._LOGGER.info("Gateway factory reset")
@@ -2,11 +2,22 @@ import base64
 from selve.util.protocol import *
 
 class Command():
+    # Serialized XML of commands without parameters (ping, getState, ...), keyed by method name
+    _xmlCache = {}
+
     def __init__(self, method_name, parameters = []) -> None:
         self.method_name = method_name
         self.parameters = parameters
 
     def serializeToXML(self):
+            if len(self.parameters) == 0:
+                xml = Command._xmlCache.get(self.method_name)
+                if xml is None:
+                    xml = Command._xmlCache[self.method_name] = self._serializeToXML()
+                return xml
+            return self._serializeToXML()
+
+    def _serializeToXML(self):
             xmlstr = "<methodCall>"
             xmlstr += "<methodName>"+self.method_name+"</methodName>"
             if (len(self.parameters) > 0):
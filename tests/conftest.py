@@ -0,0 +1,10 @@
+import logging
+
+import pytest
+
+from selve import Selve
+
+
+@pytest.fixture
+def selve():
+    return Selve(logger=logging.getLogger("selve-test"))
@@ -0,0 +1,70 @@
+import gc
+from dataclasses import dataclass
+
+
+class Entity:
+    def __init__(self):
+        self.calls = 0
+
+    def update(self):
+        self.calls += 1
+
+
+class UnhashableEntity(Entity):
+    def __eq__(self, other):
+        return isinstance(other, UnhashableEntity)
+
+
+@dataclass(frozen=True)
+class EqualEntity:
+    name: str
+
+    def update(self):
+        pass
+
+
+def _runCallbacks(selve):
+    for callback in selve._iterCallbacks(selve._callbacks):
+        callback()
+
+
+def test_bound_method_is_dropped_with_its_owner(selve):
+    entity = Entity()
+    selve.register_callback(entity.update)
+    _runCallbacks(selve)
+    assert entity.calls == 1
+
+    del entity
+    gc.collect()
+    assert selve._callbacks == {}
+
+
+def test_remove_callback(selve):
+    entity = Entity()
+    selve.register_callback(entity.update)
+    selve.register_event_callback(entity.update)
+    selve.remove_callback(entity.update)
+    selve.remove_event_callback(entity.update)
+    assert selve._callbacks == {}
+    assert selve._eventCallbacks == {}
+
+
+def test_plain_function_stays_registered(selve):
+    calls = []
+    selve.register_callback(lambda: calls.append(1))
+    gc.collect()
+    _runCallbacks(selve)
+    assert calls == [1]
+
+
+def test_owners_are_told_apart_by_identity(selve):
+    first, second = UnhashableEntity(), UnhashableEntity()
+    selve.register_callback(first.update)
+    selve.register_callback(second.update)
+    _runCallbacks(selve)
+    assert (first.calls, second.calls) == (1, 1)
+
+    equal = EqualEntity("a"), EqualEntity("a")
+    for entity in equal:
+        selve.register_event_callback(entity.update)
+    assert len(selve._eventCallbacks) == 2
@@ -0,0 +1,37 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from selve import SelveDevice, SelveSensor, SelveTypes
+
+
+def test_update_all_devices_updates_every_device_in_turn(selve):
+    for i in (1, 2, 3):
+        selve.addOrUpdateDevice(SelveDevice(i, SelveTypes.DEVICE), SelveTypes.DEVICE)
+    selve.addOrUpdateDevice(SelveSensor(4), SelveTypes.SENSOR)
+    selve.updateCommeoDeviceValues = AsyncMock(side_effect=[None, Exception("no answer"), None])
+    selve.updateSensorValuesAsync = AsyncMock()
+    selve.updateSenSimValuesAsync = AsyncMock()
+    selve.updateSenderValuesAsync = AsyncMock()
+
+    asyncio.run(selve.updateAllDevices())
+
+    assert [c.args[0] for c in selve.updateCommeoDeviceValues.await_args_list] == [1, 2, 3]
+    selve.updateSensorValuesAsync.assert_awaited_once_with(4)
+
+
+def test_find_free_id_follows_registered_devices(selve):
+    for i in (0, 1, 2):
+        selve.addOrUpdateDevice(SelveDevice(i, SelveTypes.DEVICE), SelveTypes.DEVICE)
+    assert selve.findFreeId(SelveTypes.DEVICE) == 3
+
+    selve.deleteDevice(1, SelveTypes.DEVICE)
+    assert not selve.is_id_registered(1, SelveTypes.DEVICE)
+    assert selve.findFreeId(SelveTypes.DEVICE) == 1
+
+    # devices is public, changes made on the dict directly must be seen too
+    selve.devices[SelveTypes.DEVICE.value][1] = SelveDevice(1, SelveTypes.DEVICE)
+    assert selve.findFreeId(SelveTypes.DEVICE) == 3
+
+    for i in range(7):
+        selve.addOrUpdateDevice(SelveSensor(i), SelveTypes.SENSOR)
+    assert selve.findFreeId(SelveTypes.SENSOR) is None
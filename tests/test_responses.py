@@ -0,0 +1,31 @@
+import asyncio
+
+from selve import SelveSender, SelveSensor, ServicePingResponse, SelveTypes
+
+
+def test_method_response_is_parsed(selve):
+    xml = '<?xml version="1.0" encoding="UTF-8"?><methodResponse><array><string>selve.GW.service.ping</string></array></methodResponse>'
+    response = asyncio.run(selve.processResponse(xml))
+    assert isinstance(response, ServicePingResponse)
+    assert response.name == "selve.GW.service.ping"
+
+
+def test_method_call_event_updates_device(selve):
+    xml = ('<?xml version="1.0" encoding="UTF-8"?><methodCall><methodName>selve.GW.event.device</methodName>'
+           '<array><string>Kitchen</string><int>3</int><int>1</int><int>0</int><int>0</int>'
+           '<int>0</int><int>0</int><int>1</int></array></methodCall>')
+    assert asyncio.run(selve.processResponse(xml)) is True
+    device = selve.getDevice(3, SelveTypes.DEVICE)
+    assert device is not None
+    assert device.name == "Kitchen"
+
+
+def test_sender_event_does_not_replace_sensor(selve):
+    sender = ('<?xml version="1.0" encoding="UTF-8"?><methodCall><methodName>selve.GW.event.sender</methodName>'
+              '<array><string>Remote</string><int>2</int><int>1</int></array></methodCall>')
+    sensor = ('<?xml version="1.0" encoding="UTF-8"?><methodCall><methodName>selve.GW.event.sensor</methodName>'
+              '<array>' + '<int>2</int>' + '<int>0</int>' * 11 + '</array></methodCall>')
+    assert asyncio.run(selve.processResponse(sender)) is True
+    assert asyncio.run(selve.processResponse(sensor)) is True
+    assert isinstance(selve.getDevice(2, SelveTypes.SENDER), SelveSender)
+    assert isinstance(selve.getDevice(2, SelveTypes.SENSOR), SelveSensor)
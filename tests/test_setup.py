@@ -0,0 +1,63 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+
+@pytest.fixture
+def selve(selve):
+    async def fake_setup(discover=False, fromConfigFlow=False):
+        selve.txQ = asyncio.Queue()
+        selve.rxQ = asyncio.Queue()
+        selve._serial = Mock(is_open=True, in_waiting=0)
+        await asyncio.sleep(0)
+        await selve.startWorker()
+
+    selve._setup = AsyncMock(side_effect=fake_setup)
+    return selve
+
+
+def _workerRunning(selve):
+    return selve.workerTask is not None and not selve.workerTask.done()
+
+
+def test_concurrent_setup_connects_once(selve):
+    async def run():
+        await asyncio.gather(*(selve.setup() for _ in range(5)))
+        assert selve._setup.await_count == 1
+        assert _workerRunning(selve)
+        await selve.stopGateway()
+
+    asyncio.run(run())
+
+
+def test_setup_restarts_stopped_worker(selve):
+    async def run():
+        await selve.setup()
+        await selve.stopWorker()
+        assert not _workerRunning(selve)
+
+        await selve.setup()
+        assert selve._setup.await_count == 1
+        assert _workerRunning(selve)
+        await selve.stopGateway()
+
+    asyncio.run(run())
+
+
+def test_reset_worker_state_drops_queued_commands(selve):
+    async def run():
+        await selve.setup()
+        await selve.stopWorker()
+        selve.txQ.put_nowait(Mock())
+        selve.txQ.put_nowait(Mock())
+
+        await selve.resetWorkerState()
+        assert selve.txQ.empty()
+        assert not _workerRunning(selve)
+
+        await selve.startWorker()
+        assert _workerRunning(selve)
+        await selve.stopGateway()
+
+    asyncio.run(run())